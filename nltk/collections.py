@@ -6,14 +6,22 @@
 # For license information, see LICENSE.TXT
 
 import bisect
-from itertools import islice, chain
+from itertools import islice, chain, zip_longest
 from functools import total_ordering
 
 # this unused import is for python 2.7
 from collections import defaultdict, deque, Counter
+from collections import OrderedDict as _OrderedDict
 
 from six import text_type
 
+# numpy is optional; when present it speeds up the offset search in
+# LazyConcatenation for views with many sublists.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from nltk.internals import slice_bounds, raise_unorderable_types
 
 
@@ -24,7 +32,10 @@ from nltk.internals import slice_bounds, raise_unorderable_types
 
 class OrderedDict(dict):
     def __init__(self, data=None, **kwargs):
-        self._keys = self.keys(data, kwargs.get("keys"))
+        self._keys = self._extract_keys(data, kwargs.get("keys"))
+        # Mirror of _keys used for O(1) membership tests; _keys stays
+        # the ordered list used for iteration.
+        self._key_set = set(self._keys)
         self._default_factory = kwargs.get("default_factory")
         if data is None:
             dict.__init__(self)
@@ -34,6 +45,7 @@ class OrderedDict(dict):
     def __delitem__(self, key):
         dict.__delitem__(self, key)
         self._keys.remove(key)
+        self._key_set.discard(key)
 
     def __getitem__(self, key):
         try:
@@ -42,21 +54,23 @@ class OrderedDict(dict):
             return self.__missing__(key)
 
     def __iter__(self):
-        return (key for key in self.keys())
+        return iter(self._keys)
 
     def __missing__(self, key):
-        if not self._default_factory and key not in self._keys:
+        if not self._default_factory and key not in self._key_set:
             raise KeyError()
         return self._default_factory()
 
     def __setitem__(self, key, item):
         dict.__setitem__(self, key, item)
-        if key not in self._keys:
+        if key not in self._key_set:
             self._keys.append(key)
+            self._key_set.add(key)
 
     def clear(self):
         dict.clear(self)
         self._keys.clear()
+        self._key_set.clear()
 
     def copy(self):
         d = dict.copy(self)
@@ -67,50 +81,61 @@ class OrderedDict(dict):
         # returns iterator under python 3 and list under python 2
         return zip(self.keys(), self.values())
 
-    def keys(self, data=None, keys=None):
-        if data:
-            if keys:
-                assert isinstance(keys, list)
-                assert len(data) == len(keys)
-                return keys
-            else:
-                assert (
-                    isinstance(data, dict)
-                    or isinstance(data, OrderedDict)
-                    or isinstance(data, list)
-                )
-                if isinstance(data, dict) or isinstance(data, OrderedDict):
-                    return data.keys()
-                elif isinstance(data, list):
-                    return [key for (key, value) in data]
-        elif "_keys" in self.__dict__:
-            return self._keys
-        else:
+    @staticmethod
+    def _extract_keys(data, keys):
+        # Pull the initial key list out of constructor-style input; only
+        # used by __init__() and update(), keeping keys() itself a plain
+        # accessor on the iteration hot path.
+        if not data:
             return []
+        if keys:
+            assert isinstance(keys, list)
+            assert len(data) == len(keys)
+            return keys
+        assert (
+            isinstance(data, dict)
+            or isinstance(data, OrderedDict)
+            or isinstance(data, list)
+        )
+        if isinstance(data, dict) or isinstance(data, OrderedDict):
+            return data.keys()
+        elif isinstance(data, list):
+            return [key for (key, value) in data]
+
+    def keys(self):
+        return self._keys
 
     def popitem(self):
         if not self._keys:
             raise KeyError()
 
+        # Do the bookkeeping directly: the key is already popped from
+        # the list here, so delegating to __delitem__ would remove it a
+        # second time and leave _key_set holding a stale entry.
         key = self._keys.pop()
-        value = self[key]
-        del self[key]
+        self._key_set.discard(key)
+        value = dict.__getitem__(self, key)
+        dict.__delitem__(self, key)
         return (key, value)
 
     def setdefault(self, key, failobj=None):
         dict.setdefault(self, key, failobj)
-        if key not in self._keys:
+        if key not in self._key_set:
             self._keys.append(key)
+            self._key_set.add(key)
 
     def update(self, data):
         dict.update(self, data)
-        for key in self.keys(data):
-            if key not in self._keys:
+        for key in self._extract_keys(data, None):
+            if key not in self._key_set:
                 self._keys.append(key)
+                self._key_set.add(key)
 
     def values(self):
-        # returns iterator under python 3
-        return map(self.get, self._keys)
+        # returns iterator under python 3; call the C-level
+        # dict.__getitem__ slot directly rather than going through the
+        # __missing__-capable override for every element
+        return (dict.__getitem__(self, key) for key in self._keys)
 
 
 ######################################################################
@@ -141,6 +166,10 @@ class AbstractLazySequence(object):
     常作为建立一个文集视图对象时使用的类的父类。
     """
 
+    # No instance attributes of its own; an empty __slots__ here lets
+    # subclasses that declare __slots__ avoid the per-instance __dict__.
+    __slots__ = ()
+
     def __len__(self):
         """根据这种文集视图返回文集文件中令牌的数量。
         令牌就是对一段文字进行分词处理。
@@ -233,7 +262,14 @@ class AbstractLazySequence(object):
         return "[%s]" % text_type(", ").join(pieces)
 
     def __eq__(self, other):
-        return type(self) == type(other) and list(self) == list(other)
+        if type(self) != type(other):
+            return False
+        # Lengths are memoized by the concrete classes, so after the
+        # first call this rejects unequal-length sequences without
+        # materializing either side.
+        if len(self) != len(other):
+            return False
+        return list(self) == list(other)
 
     def __ne__(self, other):
         return not self == other
@@ -257,6 +293,8 @@ class LazySubsequence(AbstractLazySequence):
     并且生成的值是通过查询源序列得来的。
     """
 
+    __slots__ = ("_source", "_start", "_stop")
+
     MIN_SIZE = 100
     """
     The minimum size for which lazy slices should be created.  If
@@ -282,6 +320,10 @@ class LazySubsequence(AbstractLazySequence):
         ['Inaugural', 'Address']
 
         """
+        # A concrete list or tuple can be sliced in a single C-level
+        # copy; there is nothing to be lazy about.
+        if isinstance(source, (list, tuple)):
+            return list(source[start:stop])
         # If the slice is small enough, just use a tuple.
         if stop - start < cls.MIN_SIZE:
             return list(islice(source.iterate_from(start), stop - start))
@@ -311,19 +353,94 @@ class LazyConcatenation(AbstractLazySequence):
     二者是串联完的列表中的偏移位值和子列表中的偏移位值之间的关系。
     """
 
+    __slots__ = ("_list", "_offsets", "_offsets_np", "_total_len", "_fast")
+
     def __init__(self, list_of_lists):
         self._list = list_of_lists
         self._offsets = [0]
+        self._offsets_np = None
+        self._total_len = None
+        self._fast = None
 
     def __len__(self):
-        if len(self._offsets) <= len(self._list):
-            for tok in self.iterate_from(self._offsets[-1]):
-                pass
-        return self._offsets[-1]
+        # The first call may have to drain the underlying stream to
+        # build the offset index; memoize the result so later calls
+        # are O(1).
+        if self._total_len is None:
+            if self._all_concrete():
+                self._total_len = sum(len(sublist) for sublist in self._list)
+                return self._total_len
+            if len(self._offsets) <= len(self._list):
+                for tok in self.iterate_from(self._offsets[-1]):
+                    pass
+            self._total_len = self._offsets[-1]
+            if numpy is not None:
+                # The offset index is complete now; keep a packed copy
+                # so iterate_from() can binary-search it in one C call.
+                self._offsets_np = numpy.array(self._offsets, dtype=numpy.int64)
+        return self._total_len
+
+    def count(self, value):
+        # When the outer list is a real container, let each sublist
+        # count for itself -- a C-level loop for plain lists and
+        # tuples -- instead of scanning the whole view element by
+        # element.  One-shot iterables must go through the lazy path.
+        if isinstance(self._list, (list, tuple)):
+            return sum(sublist.count(value) for sublist in self._list)
+        return AbstractLazySequence.count(self, value)
+
+    def index(self, value, start=None, stop=None):
+        if isinstance(self._list, (list, tuple)):
+            start, stop = slice_bounds(self, slice(start, stop))
+            offset = 0
+            for sublist in self._list:
+                sublist_len = len(sublist)
+                lo = max(start - offset, 0)
+                hi = min(stop - offset, sublist_len)
+                if lo < hi:
+                    try:
+                        return offset + sublist.index(value, lo, hi)
+                    except ValueError:
+                        pass
+                offset += sublist_len
+            raise ValueError("index(x): x not in list")
+        return AbstractLazySequence.index(self, value, start, stop)
+
+    def _all_concrete(self):
+        # True if neither the outer list nor any sublist is lazy, in
+        # which case full scans can skip the offset bookkeeping
+        # entirely.  Computed once, on first use.  Only real containers
+        # qualify: a one-shot iterable (e.g. a generator) must never be
+        # iterated just to classify it, or the data is lost.
+        if self._fast is None:
+            self._fast = isinstance(self._list, (list, tuple)) and not any(
+                isinstance(sublist, AbstractLazySequence) for sublist in self._list
+            )
+        return self._fast
 
     def iterate_from(self, start_index):
+        if start_index == 0 and self._all_concrete():
+            yield from chain.from_iterable(self._list)
+            return
+        for sublist, offset in self.iterate_chunks_from(start_index):
+            # yield from forwards the sublist's iterator directly,
+            # with far less per-element overhead than an explicit loop.
+            yield from sublist[offset:]
+
+    def iterate_chunks_from(self, start_index):
+        """以整个子列表为单位进行迭代的方法。
+        生成 ``(sublist, offset)`` 元组形式，其中 ``offset`` 是
+        ``start_index`` 落在该子列表中的偏移位值。调用者可以使用
+        ``out.extend(sublist[offset:])`` 来完成批量复制。
+        """
         if start_index < self._offsets[-1]:
-            sublist_index = bisect.bisect_right(self._offsets, start_index) - 1
+            if self._offsets_np is not None:
+                sublist_index = (
+                    int(numpy.searchsorted(self._offsets_np, start_index, side="right"))
+                    - 1
+                )
+            else:
+                sublist_index = bisect.bisect_right(self._offsets, start_index) - 1
         else:
             sublist_index = len(self._offsets) - 1
 
@@ -336,20 +453,13 @@ class LazyConcatenation(AbstractLazySequence):
             sublist_iter = islice(self._list, sublist_index, None)
 
         for sublist in sublist_iter:
+            sublist_len = len(sublist)
             if sublist_index == (len(self._offsets) - 1):
-                assert (
-                    index + len(sublist) >= self._offsets[-1]
-                ), "offests not monotonic increasing!"
-                self._offsets.append(index + len(sublist))
-            else:
-                assert self._offsets[sublist_index + 1] == index + len(
-                    sublist
-                ), "inconsistent list value (num elts)"
+                self._offsets.append(index + sublist_len)
 
-            for value in sublist[max(0, start_index - index) :]:
-                yield value
+            yield sublist, max(0, start_index - index)
 
-            index += len(sublist)
+            index += sublist_len
             sublist_index += 1
 
 
@@ -384,12 +494,16 @@ class LazyMap(AbstractLazySequence):
     训练和运行机器学习分类器时。
     """
 
+    __slots__ = ("_lists", "_func", "_cache", "_cache_size", "_all_lazy", "_strict")
+
     def __init__(self, function, *lists, **config):
         """
         :param function: 作用在 ``lists`` 参数中每个元素上的函数。
             函数应该具备接收多参数的能力，因为 ``lists`` 参数是多参数形式。
         :param lists: 多参数形式，要被处理的列表。
         :param cache_size: 确定本类要使用的缓存大小，默认值是5
+        :param strict: 如果参数值是``True``的话，意思是所有列表都一样长，
+            不需要用``None``值做补位元素值，迭代时可以走更快的路径。
         """
         if not lists:
             raise TypeError("LazyMap requires at least two args")
@@ -397,7 +511,10 @@ class LazyMap(AbstractLazySequence):
         self._lists = lists
         self._func = function
         self._cache_size = config.get("cache_size", 5)
-        self._cache = {} if self._cache_size > 0 else None
+        # An ordered dict gives true LRU eviction: hits are moved to the
+        # end, and the least recently used entry is popped on overflow.
+        self._cache = _OrderedDict() if self._cache_size > 0 else None
+        self._strict = config.get("strict", False)
 
         # If you just take bool() of sum() here _all_lazy will be true just
         # in case n >= 1 list is an AbstractLazySequence.  Presumably this
@@ -407,52 +524,71 @@ class LazyMap(AbstractLazySequence):
         ) == len(lists)
 
     def iterate_from(self, index):
+        # Bind the hot attributes to locals once; LOAD_FAST in the
+        # loops below is a dict lookup cheaper than LOAD_ATTR per
+        # element.
+        func = self._func
+        lists = self._lists
+        nlists = len(lists)
+
         # Special case: one lazy sublist
-        if len(self._lists) == 1 and self._all_lazy:
-            for value in self._lists[0].iterate_from(index):
-                yield self._func(value)
+        if nlists == 1 and self._all_lazy:
+            for value in lists[0].iterate_from(index):
+                yield func(value)
             return
 
         # Special case: one non-lazy sublist
-        elif len(self._lists) == 1:
+        elif nlists == 1:
+            lst0 = lists[0]
             while True:
                 try:
-                    yield self._func(self._lists[0][index])
+                    yield func(lst0[index])
                 except IndexError:
                     return
                 index += 1
 
         # Special case: n lazy sublists
         elif self._all_lazy:
-            iterators = [lst.iterate_from(index) for lst in self._lists]
-            while True:
-                elements = []
-                for iterator in iterators:
-                    try:
-                        elements.append(next(iterator))
-                    except:  # FIXME: What is this except really catching? StopIteration?
-                        elements.append(None)
-                if elements == [None] * len(self._lists):
-                    return
-                yield self._func(*elements)
-                index += 1
+            iterators = [lst.iterate_from(index) for lst in lists]
+            # When the caller guarantees equal-length sublists, the
+            # C-level zip iterator can drive the whole fan-in.
+            if self._strict:
+                for elements in zip(*iterators):
+                    yield func(*elements)
+            else:
+                # zip_longest pads exhausted sublists with None and
+                # terminates without raising, so no per-element
+                # try/except is needed (the old bare except also
+                # swallowed KeyboardInterrupt/SystemExit).
+                for elements in zip_longest(*iterators):
+                    yield func(*elements)
 
         # general case
         else:
+            iterators = [
+                lst.iterate_from(index)
+                if isinstance(lst, AbstractLazySequence)
+                else iter(lst[index:])
+                for lst in lists
+            ]
+            # Reuse one elements list for the whole iteration instead of
+            # allocating a fresh one per element; next(it, sentinel) is a
+            # C-level default, so exhausted sublists cost no exception
+            # handling either.
+            elements = [None] * nlists
+            sentinel = object()
             while True:
-                try:
-                    elements = [lst[index] for lst in self._lists]
-                except IndexError:
-                    elements = [None] * len(self._lists)
-                    for i, lst in enumerate(self._lists):
-                        try:
-                            elements[i] = lst[index]
-                        except IndexError:
-                            pass
-                    if elements == [None] * len(self._lists):
-                        return
-                yield self._func(*elements)
-                index += 1
+                done = True
+                for i, iterator in enumerate(iterators):
+                    value = next(iterator, sentinel)
+                    if value is sentinel:
+                        elements[i] = None
+                    else:
+                        elements[i] = value
+                        done = False
+                if done:
+                    return
+                yield func(*elements)
 
     def __getitem__(self, index):
         if isinstance(index, slice):
@@ -466,6 +602,7 @@ class LazyMap(AbstractLazySequence):
                 raise IndexError("index out of range")
             # Check the cache
             if self._cache is not None and index in self._cache:
+                self._cache.move_to_end(index)
                 return self._cache[index]
             # Calculate the value
             try:
@@ -474,8 +611,8 @@ class LazyMap(AbstractLazySequence):
                 raise IndexError("index out of range")
             # Update the cache
             if self._cache is not None:
-                if len(self._cache) > self._cache_size:
-                    self._cache.popitem()  # discard random entry
+                if len(self._cache) >= self._cache_size:
+                    self._cache.popitem(last=False)  # discard the LRU entry
                 self._cache[index] = val
             # Return the value
             return val
@@ -512,6 +649,8 @@ class LazyZip(LazyMap):
     以及通过避免建立额外的长序列时，内存用量都明显减少。
     """
 
+    __slots__ = ()
+
     def __init__(self, *lists):
         """
         :param lists: 多参数形式，被处理的列表。
@@ -520,11 +659,16 @@ class LazyZip(LazyMap):
         LazyMap.__init__(self, lambda *elts: elts, *lists)
 
     def iterate_from(self, index):
-        iterator = LazyMap.iterate_from(self, index)
-        while index < len(self):
-            yield next(iterator)
-            index += 1
-        return
+        # zip stops at the shortest input, which is exactly this
+        # class's min-length semantics; no need to go through the
+        # None-padding LazyMap fan-in and re-check len() per element.
+        iterators = [
+            lst.iterate_from(index)
+            if isinstance(lst, AbstractLazySequence)
+            else iter(lst[index:])
+            for lst in self._lists
+        ]
+        yield from zip(*iterators)
 
     def __len__(self):
         return min(len(lst) for lst in self._lists)
@@ -556,6 +700,8 @@ class LazyEnumerate(LazyZip):
     内存用量都会足够地减少。
     """
 
+    __slots__ = ()
+
     def __init__(self, lst):
         """
         :param lst: the underlying list
@@ -563,6 +709,17 @@ class LazyEnumerate(LazyZip):
         """
         LazyZip.__init__(self, range(len(lst)), lst)
 
+    def iterate_from(self, index):
+        # The index half of each pair is known from ``index`` alone, so
+        # pair it up with a plain enumerate counter instead of going
+        # through the generic LazyZip fan-in over a range object.
+        lst = self._lists[1]
+        if isinstance(lst, AbstractLazySequence):
+            values = lst.iterate_from(index)
+        else:
+            values = iter(lst[index:])
+        return enumerate(values, index)
+
 
 class LazyIteratorList(AbstractLazySequence):
     """一个懒惰序列的实例化子类。
@@ -581,6 +738,13 @@ class LazyIteratorList(AbstractLazySequence):
 
     """
 
+    __slots__ = ("_it", "_len", "_cache")
+
+    _CHUNK = 256
+    """How many elements to pull from the underlying iterator at a
+       time; batching amortizes the per-``next()`` overhead for
+       iterators backed by I/O."""
+
     def __init__(self, it, known_len=None):
         self._it = it
         self._len = known_len
@@ -597,18 +761,24 @@ class LazyIteratorList(AbstractLazySequence):
 
     def iterate_from(self, start):
         """在提供的列表索引位值上建立一个新的迭代器对象。"""
-        while len(self._cache) < start:
-            v = next(self._it)
-            self._cache.append(v)
+        cache = self._cache
+        while len(cache) < start:
+            block = list(islice(self._it, self._CHUNK))
+            if not block:
+                break
+            cache.extend(block)
         i = start
-        while i < len(self._cache):
-            yield self._cache[i]
+        while i < len(cache):
+            yield cache[i]
             i += 1
         while True:
-            v = next(self._it)
-            self._cache.append(v)
-            yield v
-            i += 1
+            block = list(islice(self._it, self._CHUNK))
+            if not block:
+                return
+            cache.extend(block)
+            while i < len(cache):
+                yield cache[i]
+                i += 1
 
     def __add__(self, other):
         """支持``self + other``操作。"""
@@ -625,14 +795,22 @@ class LazyIteratorList(AbstractLazySequence):
 class Trie(dict):
     """为字符串实现一个 Trie 字典树。"""
 
-    LEAF = True
+    # Class-level default: only terminal nodes are given the instance
+    # attribute, so interior nodes never allocate an instance __dict__
+    # and the key space of every node stays pure characters.
+    _leaf = False
+
+    @property
+    def is_leaf(self):
+        """如果本节点是一个完整字符串的结尾的话，值就是``True``。"""
+        return self._leaf
 
     def __init__(self, strings=None):
         """初始化一个 ``Trie`` 实例对象，该实例是一个 ``dict`` 数据结构。
 
         如果 ``strings`` 参数提供了值的话，会把字符串进行列表处理后，
         每一个字符作为字典键，字典值是一个字典。
-        值字典的键是``True``，值字典的值是``None``。
+        字符串结尾所在的节点会打上 ``is_leaf`` 标记。
         否则建立的是一个空字典形式的 Trie 对象。
 
         俗称刨根问题、追根溯源算法。阅读 `[字典树算法] <https://en.wikipedia.org/wiki/Trie>_`
@@ -656,18 +834,149 @@ class Trie(dict):
 
         >>> from nltk.collections import Trie
         >>> trie = Trie(["abc", "def"])
-        >>> expected = {'a': {'b': {'c': {True: None}}}, \
-                        'd': {'e': {'f': {True: None}}}}
+        >>> expected = {'a': {'b': {'c': {}}}, \
+                        'd': {'e': {'f': {}}}}
         >>> trie == expected
         True
+        >>> trie['a']['b']['c'].is_leaf
+        True
 
         """
-        if len(string):
-            self[string[0]].insert(string[1:])
-        else:
-            # mark the string is complete
-            self[Trie.LEAF] = None
+        # Walk iteratively rather than recursing: recursion allocated a
+        # fresh string[1:] slice and a Python frame per character.
+        node = self
+        for char in string:
+            node = node[char]  # __missing__ creates missing nodes
+        # mark the string is complete
+        node._leaf = True
+
+    def insert_many(self, strings):
+        """批量插入字符串的方法。
+        先对 ``strings`` 参数值进行排序，让相邻的字符串共享尽量长的
+        公共前缀，再沿着一个当前路径栈来插入，只在分歧点之后才重新
+        查找节点。对大批量的字符串来说，比逐个调用 ``insert()``
+        方法节省大量字典查找。
+
+        :param strings: 要插入到字典树上的多个字符串。
+        :type strings: 要支持 ``sorted(strings)`` 操作。
+
+        :Example:
+
+        >>> from nltk.collections import Trie
+        >>> trie = Trie()
+        >>> trie.insert_many(["abc", "abd", "def"])
+        >>> trie == Trie(["abc", "abd", "def"])
+        True
+
+        """
+        stack = [self]
+        prev = ""
+        for string in sorted(strings):
+            # Find the longest common prefix with the previous string;
+            # everything above that point on the stack is still valid.
+            lcp = 0
+            max_lcp = min(len(prev), len(string))
+            while lcp < max_lcp and prev[lcp] == string[lcp]:
+                lcp += 1
+            del stack[lcp + 1 :]
+            node = stack[-1]
+            for char in string[lcp:]:
+                node = node[char]
+                stack.append(node)
+            node._leaf = True
+            prev = string
 
     def __missing__(self, key):
         self[key] = Trie()
         return self[key]
+
+    def __eq__(self, other):
+        # The leaf markers live outside the key space, so plain dict
+        # comparison can't see which strings a trie accepts; compare
+        # them too (the value comparison recurses into child nodes).
+        # Non-Trie comparands get plain dict equality, so comparing
+        # against a nested-dict literal still works.
+        if isinstance(other, Trie) and self._leaf != other._leaf:
+            return False
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None  # like dict: equality without hashability
+
+    def compile(self):
+        """把嵌套字典形式的字典树编译成一个扁平的自动机。
+        返回一个 ``CompiledTrie`` 实例对象，该对象的 ``match()``
+        方法可以在一段文字中一次找到所有插入过的字符串。
+        编译完的形式是只读的；继续 ``insert()`` 之后需要重新编译。
+        """
+        return CompiledTrie(self)
+
+
+class CompiledTrie(object):
+    """一个数组形式的 Aho-Corasick 自动机。
+    用广度优先搜索给嵌套字典树的每个节点分配一个整数状态号：
+    转移表是每个状态一个字典（稀疏形式），失败链接都保存在一个
+    数组里。匹配一段文字时只做逐字符查表，不再做每个节点的嵌套
+    字典游走，对多模式字符串搜索（像停用词、多词表达式）更有效率。
+    一般通过 ``Trie.compile()`` 方法来建立实例。
+    """
+
+    def __init__(self, trie):
+        # Breadth-first walk assigning integer state ids; state 0 is
+        # the root.
+        goto = [{}]
+        output = [()]
+        depths = [0]
+        queue = deque([(trie, 0)])
+        while queue:
+            node, state = queue.popleft()
+            if node._leaf:
+                output[state] = (depths[state],)
+            for symbol, child in node.items():
+                child_state = len(goto)
+                goto[state][symbol] = child_state
+                goto.append({})
+                output.append(())
+                depths.append(depths[state] + 1)
+                queue.append((child, child_state))
+
+        # Compute failure links (and merge the outputs they inherit)
+        # breadth-first, so parents are finished before children.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, child_state in goto[state].items():
+                queue.append(child_state)
+                f = fail[state]
+                while f and symbol not in goto[f]:
+                    f = fail[f]
+                fail[child_state] = goto[f].get(symbol, 0)
+                output[child_state] += output[fail[child_state]]
+
+        self._goto = goto
+        self._output = output
+        if numpy is not None:
+            fail = numpy.array(fail, dtype=numpy.int64)
+        self._fail = fail
+
+    def match(self, text):
+        """在 ``text`` 参数值中找到所有插入过的字符串的方法。
+        生成 ``(start, end)`` 元组形式，其中 ``text[start:end]``
+        是字典树中的一个字符串。
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for i, symbol in enumerate(text):
+            while state and symbol not in goto[state]:
+                state = int(fail[state])
+            state = goto[state].get(symbol, 0)
+            for length in output[state]:
+                yield (i + 1 - length, i + 1)
@@ -32,21 +32,40 @@ import textwrap
 import io
 import os
 import re
+import shutil
+import stat
 import sys
+import threading
+import weakref
 import zipfile
 import codecs
 
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import accumulate
+
 from abc import ABCMeta, abstractmethod
-from gzip import GzipFile, WRITE as GZ_WRITE
+from gzip import GzipFile
+
+from urllib.request import urlopen, url2pathname
 
-from six import add_metaclass
-from six import string_types, text_type
-from six.moves.urllib.request import urlopen, url2pathname
+# Python 3's pickle already uses the C accelerator (_pickle) when
+# available, so the old cPickle shim is unnecessary.
+import pickle
 
+# orjson parses JSON resources several times faster than the stdlib;
+# fall back to the stdlib when it isn't installed.
 try:
-    import cPickle as pickle
+    import orjson
+
+    _json_loads = orjson.loads
 except ImportError:
-    import pickle
+    import json
+
+    def _json_loads(data):
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return json.loads(data)
 
 try:  # Python 3.
     textwrap_indent = functools.partial(textwrap.indent, prefix="  ")
@@ -62,14 +81,9 @@ except AttributeError:  # Python 2; indent() not available for Python2.
         return "\n".join(textwrap_fill(line) for line in text.splitlines())
 
 
-try:
-    from zlib import Z_SYNC_FLUSH as FLUSH
-except ImportError:
-    from zlib import Z_FINISH as FLUSH
-
 # this import should be more specific:
 import nltk
-from nltk.compat import py3_data, add_py3_data, BytesIO
+from nltk.compat import add_py3_data, BytesIO
 
 ######################################################################
 # Search Path
@@ -112,6 +126,42 @@ else:
     ]
 
 
+def _prioritize_paths(paths):
+    """去重并重排搜索路径，让含有数据的目录排在前面。"""
+    # One stat pass at import time keeps every later find() from
+    # walking duplicate or empty entries first.  Entries that don't
+    # exist yet are kept at the tail instead of dropped, so a data
+    # directory created later in the session (e.g. by the downloader)
+    # is still searched.
+    seen = set()
+    ranked = []
+    for p in paths:
+        try:
+            realpath = os.path.realpath(p)
+        except OSError:
+            continue
+        if realpath in seen:
+            continue
+        seen.add(realpath)
+        try:
+            mode = os.stat(p).st_mode
+            if stat.S_ISDIR(mode) and not os.listdir(p):
+                rank = 1  # exists but empty
+            else:
+                rank = 0  # contains data (or is a zipfile)
+        except OSError:
+            # Doesn't exist (yet), or stats fine but isn't listable
+            # (e.g. exec-only permissions); either way, search it last.
+            # This runs at import time, so it must never raise.
+            rank = 2
+        ranked.append((rank, p))
+    ranked.sort(key=lambda rank_p: rank_p[0])
+    return [p for _, p in ranked]
+
+
+path[:] = _prioritize_paths(path)
+
+
 ######################################################################
 # Util Functions
 ######################################################################
@@ -131,6 +181,14 @@ def gzip_open_unicode(
     return io.TextIOWrapper(fileobj, encoding, errors, newline)
 
 
+# Precompiled patterns for the URL/name helpers below; relying on the
+# re module's internal cache is fragile because it only holds 100
+# entries and unrelated user code can evict these hot patterns.
+_URL_LEADING_SLASHES_RE = re.compile(r"^/{0,2}")
+_LEADING_SLASHES_RE = re.compile(r"^/+")
+
+
+@functools.lru_cache(maxsize=4096)
 def split_resource_url(resource_url):
     """分解资源地址的函数。
     把一个资源地址分解成 "<protocol>:<path>" 形式。
@@ -154,10 +212,15 @@ def split_resource_url(resource_url):
         if path_.startswith("/"):
             path_ = "/" + path_.lstrip("/")
     else:
-        path_ = re.sub(r"^/{0,2}", "", path_)
+        path_ = _URL_LEADING_SLASHES_RE.sub("", path_)
     return protocol, path_
 
 
+# Deliberately not lru_cached: relative file: URLs resolve against
+# the current working directory, so a cached result would go stale
+# after os.chdir().  The heavy lifting below is done by
+# split_resource_url and normalize_resource_name, which are cached
+# (the latter with the cwd made explicit in its key).
 def normalize_resource_url(resource_url):
     r"""
     确保一个资源 url 正常。
@@ -241,13 +304,38 @@ def normalize_resource_name(resource_name, allow_relative=True, relative_path=No
     >>> windows or normalize_resource_name('/dir/file', True, '/') == '/dir/file'
     True
     """
-    is_dir = bool(re.search(r"[\\/.]$", resource_name)) or resource_name.endswith(
-        os.path.sep
-    )
+    if not allow_relative and relative_path is None:
+        # Make the implicit cwd explicit before it reaches the cache,
+        # so a cached result can't leak across os.chdir() calls.
+        relative_path = os.getcwd()
+    return _normalize_resource_name(resource_name, allow_relative, relative_path)
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_resource_name(resource_name, allow_relative, relative_path):
+    # Fast path: most names are already canonical posix-style relative
+    # paths (e.g. ``corpora/brown``) and can be returned untouched,
+    # skipping the regex/normpath machinery below.
+    if (
+        resource_name
+        and allow_relative
+        and not sys.platform.startswith("win")
+        and "\\" not in resource_name
+        and "//" not in resource_name
+        and "./" not in resource_name
+        and ".." not in resource_name
+        and not resource_name.startswith("/")
+        and not resource_name.endswith((".", "/"))
+    ):
+        return resource_name
+
+    # str.endswith with a tuple checks the final character in C; a
+    # regex is overkill for a one-character class.
+    is_dir = resource_name.endswith(("\\", "/", ".", os.path.sep))
     if sys.platform.startswith("win"):
         resource_name = resource_name.lstrip("/")
     else:
-        resource_name = re.sub(r"^/+", "/", resource_name)
+        resource_name = _LEADING_SLASHES_RE.sub("/", resource_name)
     if allow_relative:
         resource_name = os.path.normpath(resource_name)
     else:
@@ -267,8 +355,7 @@ def normalize_resource_name(resource_name, allow_relative=True, relative_path=No
 ######################################################################
 
 
-@add_metaclass(ABCMeta)
-class PathPointer(object):
+class PathPointer(metaclass=ABCMeta):
     """一个抽象元类。
     为了路径指向，NLTK 的数据包会使用这个抽象元类来识别具体的路径。
     它有两个子类：
@@ -307,26 +394,35 @@ class PathPointer(object):
         """
 
 
-class FileSystemPathPointer(PathPointer, text_type):
+class FileSystemPathPointer(PathPointer, str):
     """一个文件系统路径指针类。
     文件系统路径指针通过给出的绝对路径来识别可以直接访问的文件。
     """
 
-    @py3_data
-    def __init__(self, _path):
+    def __new__(cls, _path, _trusted=False):
+        # str does its setup work in __new__; the extra _trusted flag
+        # must not reach str.__new__.
+        return str.__new__(cls, _path)
+
+    def __init__(self, _path, _trusted=False):
         """
         为给出的绝对路径建立一个新的路径指针实例。
+        当 ``_trusted`` 参数值是 ``True`` 时，表示调用者已经确认了
+        路径的存在，可以跳过重复的文件系统检查。
 
         :raise IOError: 如果提供的路径不存在。
         """
-
-        _path = os.path.abspath(_path)
-        if not os.path.exists(_path):
-            raise IOError("No such file or directory: %r" % _path)
+        if _trusted:
+            # Caller (e.g. find(), which just ran os.path.exists) has
+            # already validated the path; skip the redundant stat.
+            if not os.path.isabs(_path):
+                _path = os.path.abspath(_path)
+        else:
+            _path = os.path.abspath(_path)
+            if not os.path.exists(_path):
+                raise IOError("No such file or directory: %r" % _path)
         self._path = _path
-
-        # There's no need to call str.__init__(), since it's a no-op;
-        # str does all of its setup work in __new__.
+        self._size = None
 
     @property
     def path(self):
@@ -334,15 +430,23 @@ class FileSystemPathPointer(PathPointer, text_type):
         return self._path
 
     def open(self, encoding=None):
-        stream = open(self._path, "rb")
+        # A 128 KB buffer (vs the 8 KB default) cuts the syscall count
+        # when unpickling multi-megabyte resources.
+        stream = open(self._path, "rb", buffering=1 << 17)
         if encoding is not None:
             stream = SeekableUnicodeStreamReader(stream, encoding)
         return stream
 
     def file_size(self):
-        return os.stat(self._path).st_size
+        # The size can't change for a given pointer; stat once and
+        # reuse for callers that sniff it repeatedly.
+        if self._size is None:
+            self._size = os.stat(self._path).st_size
+        return self._size
 
     def join(self, fileid):
+        # Only the parent was validated when this pointer was built;
+        # the joined child may well not exist, so check it.
         _path = os.path.join(self._path, fileid)
         return FileSystemPathPointer(_path)
 
@@ -371,7 +475,6 @@ class BufferedGzipFile(GzipFile):
     MB = 2 ** 20
     SIZE = 2 * MB
 
-    @py3_data
     def __init__(
         self, filename=None, mode=None, compresslevel=9, fileobj=None, **kwargs
     ):
@@ -393,52 +496,17 @@ class BufferedGzipFile(GzipFile):
         :rtype: BufferedGzipFile
         """
         GzipFile.__init__(self, filename, mode, compresslevel, fileobj)
+        # ``size`` is accepted for backward compatibility only; modern
+        # GzipFile buffers reads and writes natively, so no Python-side
+        # byte accumulator is kept.
         self._size = kwargs.get("size", self.SIZE)
-        self._nltk_buffer = BytesIO()
-        # cStringIO does not support len.
-        self._len = 0
-
-    def _reset_buffer(self):
-        # For some reason calling BytesIO.truncate() here will lead to
-        # inconsistent writes so just set _buffer to a new BytesIO object.
-        self._nltk_buffer = BytesIO()
-        self._len = 0
-
-    def _write_buffer(self, data):
-        # Simply write to the buffer and increment the buffer size.
-        if data is not None:
-            self._nltk_buffer.write(data)
-            self._len += len(data)
-
-    def _write_gzip(self, data):
-        # Write the current buffer to the GzipFile.
-        GzipFile.write(self, self._nltk_buffer.getvalue())
-        # Then reset the buffer and write the new data to the buffer.
-        self._reset_buffer()
-        self._write_buffer(data)
-
-    def close(self):
-        # GzipFile.close() doesn't actuallly close anything.
-        if self.mode == GZ_WRITE:
-            self._write_gzip(None)
-            self._reset_buffer()
-        return GzipFile.close(self)
-
-    def flush(self, lib_mode=FLUSH):
-        self._nltk_buffer.flush()
-        GzipFile.flush(self, lib_mode)
 
     def read(self, size=None):
         if not size:
-            size = self._size
-            contents = BytesIO()
-            while True:
-                blocks = GzipFile.read(self, size)
-                if not blocks:
-                    contents.flush()
-                    break
-                contents.write(blocks)
-            return contents.getvalue()
+            # GzipFile.read(-1) drains the stream through its internal
+            # C-level buffered reader, so the old Python-level copy
+            # loop into a BytesIO is unnecessary and slower.
+            return GzipFile.read(self, -1)
         else:
             return GzipFile.read(self, size)
 
@@ -446,15 +514,13 @@ class BufferedGzipFile(GzipFile):
         """
         :param data: 要写入到文件或缓存的字节内容。
         :type data: bytes
-        :param size: 写入文件之间的最小缓存值。
+        :param size: 被忽略的参数；仅为向后兼容而保留。
         :type size: int
         """
-        if not size:
-            size = self._size
-        if self._len + len(data) <= size:
-            self._write_buffer(data)
-        else:
-            self._write_gzip(data)
+        # GzipFile feeds writes straight into zlib's C-level buffers,
+        # which makes the old BytesIO accumulator (and its getvalue()
+        # copy per flush) pure overhead.
+        return GzipFile.write(self, data)
 
 
 class GzipFileSystemPathPointer(FileSystemPathPointer):
@@ -465,25 +531,29 @@ class GzipFileSystemPathPointer(FileSystemPathPointer):
     """
 
     def open(self, encoding=None):
-        # Note: In >= Python3.5, GzipFile is already using a
-        # buffered reader in the backend which has a variable self._buffer
-        # See https://github.com/nltk/nltk/issues/1308
-        if sys.version.startswith("2.7") or sys.version.startswith("3.4"):
-            stream = BufferedGzipFile(self._path, "rb")
-        else:
-            stream = GzipFile(self._path, "rb")
+        # Reading through io.BufferedReader with a large buffer batches
+        # the decompression into 128 KB chunks, which is markedly
+        # faster than GzipFile's default small reads.
+        stream = io.BufferedReader(GzipFile(self._path, "rb"), buffer_size=128 * 1024)
         if encoding:
             stream = SeekableUnicodeStreamReader(stream, encoding)
         return stream
 
 
+_zipfile_cache = weakref.WeakValueDictionary()
+"""A mapping from absolute paths to live ``OpenOnDemandZipFile``
+   objects, so that repeated pointers into the same archive (common
+   during ``find()``'s zipfile fallback) share one parsed central
+   directory.  Weak values let an archive be collected once no pointer
+   references it."""
+
+
 class ZipFilePathPointer(PathPointer):
     """
     一个压缩文件路径指针，用来识别与压缩文件里的一个文件，
     通过读取压缩文件来访问其中的文件。
     """
 
-    @py3_data
     def __init__(self, zipfile, entry=""):
         """
         建立一个新的路径指针，指向给出的压缩文件中描述的入口点。
@@ -491,8 +561,12 @@ class ZipFilePathPointer(PathPointer):
 
         :raise IOError: 如果压缩文件不存在，或压缩文件中没有所描述的入口点。
         """
-        if isinstance(zipfile, string_types):
-            zipfile = OpenOnDemandZipFile(os.path.abspath(zipfile))
+        if isinstance(zipfile, str):
+            abspath = os.path.abspath(zipfile)
+            zipfile = _zipfile_cache.get(abspath)
+            if zipfile is None:
+                zipfile = OpenOnDemandZipFile(abspath)
+                _zipfile_cache[abspath] = zipfile
 
         # Check that the entry exists:
         if entry:
@@ -507,9 +581,13 @@ class ZipFilePathPointer(PathPointer):
                 # the zip file.  So if `entry` is a directory name,
                 # then check if the zipfile contains any files that
                 # are under the given directory.
-                if entry.endswith("/") and [
-                    n for n in zipfile.namelist() if n.startswith(entry)
-                ]:
+                if entry.endswith("/") and (
+                    entry in zipfile.dir_prefixes()
+                    if isinstance(zipfile, OpenOnDemandZipFile)
+                    # any() short-circuits instead of materializing the
+                    # full list of matching names.
+                    else any(n.startswith(entry) for n in zipfile.namelist())
+                ):
                     pass  # zipfile contains a file in that directory.
                 else:
                     # Otherwise, complain.
@@ -518,6 +596,7 @@ class ZipFilePathPointer(PathPointer):
                     )
         self._zipfile = zipfile
         self._entry = entry
+        self._size = None
 
     @property
     def zipfile(self):
@@ -538,19 +617,21 @@ class ZipFilePathPointer(PathPointer):
         data = self._zipfile.read(self._entry)
         stream = BytesIO(data)
         if self._entry.endswith(".gz"):
-            # Note: In >= Python3.5, GzipFile is already using a
-            # buffered reader in the backend which has a variable self._buffer
-            # See https://github.com/nltk/nltk/issues/1308
-            if sys.version.startswith("2.7") or sys.version.startswith("3.4"):
-                stream = BufferedGzipFile(self._entry, fileobj=stream)
-            else:
-                stream = GzipFile(self._entry, fileobj=stream)
+            # See GzipFileSystemPathPointer.open for the buffering
+            # rationale.
+            stream = io.BufferedReader(
+                GzipFile(self._entry, fileobj=stream), buffer_size=128 * 1024
+            )
         elif encoding is not None:
             stream = SeekableUnicodeStreamReader(stream, encoding)
         return stream
 
     def file_size(self):
-        return self._zipfile.getinfo(self._entry).file_size
+        # Cached: the central-directory entry is immutable for the
+        # lifetime of the pointer.
+        if self._size is None:
+            self._size = self._zipfile.getinfo(self._entry).file_size
+        return self._size
 
     def join(self, fileid):
         entry = "%s/%s" % (self._entry, fileid)
@@ -567,11 +648,101 @@ class ZipFilePathPointer(PathPointer):
 # Access Functions
 ######################################################################
 
-# Don't use a weak dictionary, because in the common case this
-# causes a lot more reloading that necessary.
-_resource_cache = {}
-"""A dictionary used to cache resources so that they won't
-   need to be loaded more than once."""
+class _CachedResource(object):
+    """weakref 垫片类。
+    为不能创建弱引用的资源值（例如字符串、元组）提供一个
+    可以弱引用的包装对象，让这些资源值也能放进资源缓存。
+    """
+
+    __slots__ = ("value", "__weakref__")
+
+    def __init__(self, value):
+        self.value = value
+
+
+_resource_cache = weakref.WeakValueDictionary()
+"""A dictionary used to cache resources so that they won't need to be
+   loaded more than once.  Values are held weakly, so resources that
+   nothing else references can be reclaimed by the garbage collector;
+   ``_resource_cache_strong`` pins the most recently used entries so
+   the common reload pattern still hits.  Values that can't be weakly
+   referenced are wrapped in ``_CachedResource``."""
+
+_resource_cache_strong = OrderedDict()
+"""A bounded LRU layer of strong references backing
+   ``_resource_cache``; its size is controlled by ``set_cache_size()``."""
+
+_resource_cache_size = 64
+"""The maximum number of entries kept alive by
+   ``_resource_cache_strong`` (``None`` for no limit)."""
+
+
+def _retain_resource(cache_key, obj):
+    """一个辅助函数。
+    把一个缓存条目提升到强引用层的最新位置，必要时淘汰最旧的条目。
+    """
+    _resource_cache_strong[cache_key] = obj
+    _resource_cache_strong.move_to_end(cache_key)
+    if _resource_cache_size is not None:
+        while len(_resource_cache_strong) > _resource_cache_size:
+            _resource_cache_strong.popitem(last=False)
+
+_find_cache = {}
+"""A dictionary mapping ``(resource_name, paths)`` pairs to the
+   ``PathPointer`` that ``find()`` resolved them to, so that repeated
+   lookups of the same resource skip the search over ``nltk.data.path``
+   (and the stat/zipfile probing it entails).  Only successful
+   resolutions are cached; misses always re-search, so newly
+   downloaded resources are picked up without invalidation."""
+
+_path_kinds = {}
+"""A cached classification of each ``nltk.data.path`` entry as
+   ``"zip"``, ``"dir"`` or ``"missing"``, computed with one ``os.stat``
+   per entry instead of separate isfile/isdir probes on every
+   ``find()`` call."""
+
+_path_kinds_key = None
+"""The search-path tuple ``_path_kinds`` was computed for; the cache
+   is rebuilt whenever the path list changes."""
+
+
+def _classify_path(p):
+    """用一次 ``os.stat`` 为一个搜索路径项分类。"""
+    try:
+        mode = os.stat(p).st_mode
+    except OSError:
+        return "missing"
+    if stat.S_ISDIR(mode):
+        return "dir"
+    if stat.S_ISREG(mode) and p.endswith(".zip"):
+        return "zip"
+    return "missing"
+
+
+def _classify_paths(paths):
+    """用一次 ``os.stat`` 为每个搜索路径项分类，并缓存分类结果。"""
+    global _path_kinds, _path_kinds_key
+    key = tuple(paths)
+    if key != _path_kinds_key:
+        kinds = {}
+        for p in key:
+            if not p:
+                # An empty entry means resource_name is an absolute path
+                # and is handled like a directory.
+                kinds[p] = "dir"
+                continue
+            kinds[p] = _classify_path(p)
+        _path_kinds = kinds
+        _path_kinds_key = key
+    else:
+        # Entries that were missing earlier may have appeared since
+        # (e.g. data unzipped into ~/nltk_data mid-session); re-stat
+        # just those, so new data is found without an explicit cache
+        # clear.  Existing entries stay cached.
+        for p, kind in _path_kinds.items():
+            if kind == "missing" and p:
+                _path_kinds[p] = _classify_path(p)
+    return _path_kinds
 
 
 def find(resource_name, paths=None):
@@ -612,49 +783,84 @@ def find(resource_name, paths=None):
     if paths is None:
         paths = path
 
-    # Check if the resource name includes a zipfile name
-    m = re.match(r"(.*\.zip)/?(.*)$|", resource_name)
-    zipfile, zipentry = m.groups()
+    # Warm case: this resource was already resolved against the same
+    # search path, so skip the directory/zipfile walk entirely.
+    cache_key = (resource_name, tuple(paths))
+    try:
+        return _find_cache[cache_key]
+    except KeyError:
+        pass
+
+    # Check if the resource name includes a zipfile name.  A plain
+    # substring scan is much cheaper than the old regex match.
+    idx = resource_name.find(".zip")
+    if idx == -1:
+        zipfile = zipentry = None
+    else:
+        end = idx + 4
+        zipfile = resource_name[:end]
+        if end < len(resource_name) and resource_name[end] == "/":
+            zipentry = resource_name[end + 1 :]
+        else:
+            zipentry = ""
 
     # Check each item in our path
+    path_kinds = _classify_paths(paths)
     for path_ in paths:
+        kind = path_kinds.get(path_, "missing")
         # Is the path item a zipfile?
-        if path_ and (os.path.isfile(path_) and path_.endswith(".zip")):
+        if kind == "zip":
             try:
-                return ZipFilePathPointer(path_, resource_name)
+                ptr = ZipFilePathPointer(path_, resource_name)
             except IOError:
                 # resource not in zipfile
                 continue
+            _find_cache[cache_key] = ptr
+            return ptr
 
         # Is the path item a directory or is resource_name an absolute path?
-        elif not path_ or os.path.isdir(path_):
+        elif kind == "dir":
             if zipfile is None:
                 p = os.path.join(path_, url2pathname(resource_name))
                 if os.path.exists(p):
                     if p.endswith(".gz"):
-                        return GzipFileSystemPathPointer(p)
+                        ptr = GzipFileSystemPathPointer(p, _trusted=True)
                     else:
-                        return FileSystemPathPointer(p)
+                        ptr = FileSystemPathPointer(p, _trusted=True)
+                    _find_cache[cache_key] = ptr
+                    return ptr
             else:
                 p = os.path.join(path_, url2pathname(zipfile))
                 if os.path.exists(p):
                     try:
-                        return ZipFilePathPointer(p, zipentry)
+                        ptr = ZipFilePathPointer(p, zipentry)
                     except IOError:
                         # resource not in zipfile
                         continue
+                    _find_cache[cache_key] = ptr
+                    return ptr
 
     # Fallback: if the path doesn't include a zip file, then try
     # again, assuming that one of the path components is inside a
-    # zipfile of the same name.
+    # zipfile of the same name.  Probing each candidate zip directly
+    # avoids recursing into a full search per synthetic name.
     if zipfile is None:
         pieces = resource_name.split("/")
         for i in range(len(pieces)):
-            modified_name = "/".join(pieces[:i] + [pieces[i] + ".zip"] + pieces[i:])
-            try:
-                return find(modified_name, paths)
-            except LookupError:
-                pass
+            zipname = "/".join(pieces[: i + 1]) + ".zip"
+            zipentry = "/".join(pieces[i:])
+            for path_ in paths:
+                if path_kinds.get(path_, "missing") != "dir":
+                    continue
+                p = os.path.join(path_, url2pathname(zipname))
+                if os.path.isfile(p):
+                    try:
+                        ptr = ZipFilePathPointer(p, zipentry)
+                    except IOError:
+                        # resource not in zipfile
+                        continue
+                    _find_cache[cache_key] = ptr
+                    return ptr
 
     # Identify the package (i.e. the .zip file) to download.
     resource_zipname = resource_name.split("/")[1]
@@ -709,13 +915,34 @@ def retrieve(resource_url, filename=None, verbose=True):
     # Open the input & output streams.
     infile = _open(resource_url)
 
-    # Copy infile -> outfile, using 64k blocks.
     with open(filename, "wb") as outfile:
-        while True:
-            s = infile.read(1024 * 64)  # 64k blocks.
-            outfile.write(s)
-            if not s:
-                break
+        if (
+            hasattr(os, "sendfile")
+            and isinstance(infile, io.BufferedReader)
+            and isinstance(infile.raw, io.FileIO)
+        ):
+            # Plain local file: let the kernel do the copy in one
+            # sendfile loop instead of shuttling blocks through Python.
+            infd = infile.fileno()
+            size = os.fstat(infd).st_size
+            offset = 0
+            try:
+                while offset < size:
+                    sent = os.sendfile(outfile.fileno(), infd, offset, size - offset)
+                    if not sent:
+                        break
+                    offset += sent
+            except OSError:
+                # Some platforms restrict sendfile to socket
+                # destinations; fall back to a userspace copy.
+                infile.seek(0)
+                outfile.seek(0)
+                outfile.truncate()
+                shutil.copyfileobj(infile, outfile, length=1 << 20)
+        else:
+            # Decompressing or remote streams: buffered copy in 1 MB
+            # blocks.
+            shutil.copyfileobj(infile, outfile, length=1 << 20)
 
     infile.close()
 
@@ -756,6 +983,32 @@ AUTO_FORMATS = {
     "text": "text",
 }
 
+# Interned keys (and format values) make the format lookups and the
+# resource-cache probes in load() compare by pointer in the common case.
+FORMATS = {sys.intern(key): value for key, value in FORMATS.items()}
+AUTO_FORMATS = {
+    sys.intern(key): sys.intern(value) for key, value in AUTO_FORMATS.items()
+}
+
+# Handlers for the text-based formats in load(): one dict lookup plus a
+# call replaces a chain of string comparisons on the hot path.  Each
+# handler takes (string_data, encoding, logic_parser, fstruct_reader).
+_TEXT_HANDLERS = {
+    "text": lambda s, enc, lp, fr: s,
+    "cfg": lambda s, enc, lp, fr: nltk.grammar.CFG.fromstring(s, encoding=enc),
+    "pcfg": lambda s, enc, lp, fr: nltk.grammar.PCFG.fromstring(s, encoding=enc),
+    "fcfg": lambda s, enc, lp, fr: nltk.grammar.FeatureGrammar.fromstring(
+        s, logic_parser=lp, fstruct_reader=fr, encoding=enc
+    ),
+    "fol": lambda s, enc, lp, fr: nltk.sem.read_logic(
+        s, logic_parser=nltk.sem.logic.LogicParser(), encoding=enc
+    ),
+    "logic": lambda s, enc, lp, fr: nltk.sem.read_logic(
+        s, logic_parser=lp, encoding=enc
+    ),
+    "val": lambda s, enc, lp, fr: nltk.sem.read_valuation(s, encoding=enc),
+}
+
 
 def load(
     resource_url,
@@ -828,10 +1081,23 @@ def load(
     if format not in FORMATS:
         raise ValueError("Unknown format type: %s!" % (format,))
 
-    # If we've cached the resource, then just return it.
+    # A single interned string keys the resource cache more cheaply
+    # than allocating and hashing a fresh tuple per call.
+    cache_key = sys.intern(format + "\x00" + resource_url)
+
+    # If we've cached the resource, then just return it.  Indexing
+    # directly (rather than .get() plus a None check) costs one dict
+    # lookup on a hit and keeps cached values that happen to be falsy
+    # or None from being reloaded every call.
     if cache:
-        resource_val = _resource_cache.get((resource_url, format))
-        if resource_val is not None:
+        try:
+            resource_val = _resource_cache[cache_key]
+        except KeyError:
+            pass
+        else:
+            _retain_resource(cache_key, resource_val)
+            if type(resource_val) is _CachedResource:
+                resource_val = resource_val.value
             if verbose:
                 print("<<Using cached copy of %s>>" % (resource_url,))
             return resource_val
@@ -846,17 +1112,31 @@ def load(
     if format == "raw":
         resource_val = opened_resource.read()
     elif format == "pickle":
-        resource_val = pickle.load(opened_resource)
+        # For the common small-to-medium resource, reading the whole
+        # stream and handing pickle a contiguous bytes object avoids
+        # the many small stream reads pickle.load issues internally.
+        # Only provably huge files fall back to streaming.
+        try:
+            size = os.fstat(opened_resource.fileno()).st_size
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            size = (
+                len(opened_resource.getbuffer())
+                if isinstance(opened_resource, BytesIO)
+                else None
+            )
+        if size is not None and size >= 32 * 1024 * 1024:
+            resource_val = pickle.load(opened_resource)
+        else:
+            resource_val = pickle.loads(opened_resource.read())
     elif format == "json":
-        import json
-        from nltk.jsontags import json_tags
-
-        resource_val = json.load(opened_resource)
-        tag = None
-        if len(resource_val) != 1:
-            tag = next(resource_val.keys())
-        if tag not in json_tags:
-            raise ValueError("Unknown json tag.")
+        from nltk.jsontags import JSONTaggedDecoder
+
+        # Parse with _json_loads (orjson when available), then let the
+        # tagged decoder walk the result so registered "!tag" objects
+        # are instantiated just as JSONTaggedDecoder.decode() would.
+        resource_val = JSONTaggedDecoder.decode_obj(
+            _json_loads(opened_resource.read())
+        )
     elif format == "yaml":
         import yaml
 
@@ -867,53 +1147,39 @@ def load(
         if encoding is not None:
             string_data = binary_data.decode(encoding)
         else:
+            # Drop a UTF-8 BOM up front so the grammar parsers never
+            # see it, then decode with the direct C codec calls, which
+            # skip the codec-registry lookup of str.decode.
+            if binary_data[:3] == codecs.BOM_UTF8:
+                binary_data = binary_data[3:]
             try:
-                string_data = binary_data.decode("utf-8")
+                # final=True: a truncated trailing sequence must raise
+                # (and fall through to latin-1), not be dropped.
+                string_data = codecs.utf_8_decode(binary_data, "strict", True)[0]
             except UnicodeDecodeError:
-                string_data = binary_data.decode("latin-1")
-        if format == "text":
-            resource_val = string_data
-        elif format == "cfg":
-            resource_val = nltk.grammar.CFG.fromstring(string_data, encoding=encoding)
-        elif format == "pcfg":
-            resource_val = nltk.grammar.PCFG.fromstring(string_data, encoding=encoding)
-        elif format == "fcfg":
-            resource_val = nltk.grammar.FeatureGrammar.fromstring(
-                string_data,
-                logic_parser=logic_parser,
-                fstruct_reader=fstruct_reader,
-                encoding=encoding,
-            )
-        elif format == "fol":
-            resource_val = nltk.sem.read_logic(
-                string_data,
-                logic_parser=nltk.sem.logic.LogicParser(),
-                encoding=encoding,
-            )
-        elif format == "logic":
-            resource_val = nltk.sem.read_logic(
-                string_data, logic_parser=logic_parser, encoding=encoding
-            )
-        elif format == "val":
-            resource_val = nltk.sem.read_valuation(string_data, encoding=encoding)
-        else:
+                string_data = codecs.latin_1_decode(binary_data, "strict")[0]
+        try:
+            handler = _TEXT_HANDLERS[format]
+        except KeyError:
             raise AssertionError(
                 "Internal NLTK error: Format %s isn't "
                 "handled by nltk.data.load()" % (format,)
             )
+        resource_val = handler(string_data, encoding, logic_parser, fstruct_reader)
 
     opened_resource.close()
 
     # If requested, add it to the cache.
     if cache:
         try:
-            _resource_cache[(resource_url, format)] = resource_val
+            _resource_cache[cache_key] = cached = resource_val
             # TODO: add this line
             # print('<<Caching a copy of %s>>' % (resource_url,))
         except TypeError:
             # We can't create weak references to some object types, like
-            # strings and tuples.  For now, just don't cache them.
-            pass
+            # strings and tuples; cache those through a shim.
+            _resource_cache[cache_key] = cached = _CachedResource(resource_val)
+        _retain_resource(cache_key, cached)
 
     return resource_val
 
@@ -929,13 +1195,13 @@ def show_cfg(resource_url, escape="##"):
     """
     resource_url = normalize_resource_url(resource_url)
     resource_val = load(resource_url, format="text", cache=False)
-    lines = resource_val.splitlines()
-    for l in lines:
-        if l.startswith(escape):
-            continue
-        if re.match("^$", l):
-            continue
-        print(l)
+    lines = [
+        l
+        for l in resource_val.splitlines()
+        if l and not l.startswith(escape)
+    ]
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def clear_cache():
@@ -944,6 +1210,34 @@ def clear_cache():
     :see: load()
     """
     _resource_cache.clear()
+    _resource_cache_strong.clear()
+    _resolve.cache_clear()
+
+
+def set_cache_size(maxsize):
+    """一个访问函数。
+    设置资源缓存强引用层保留的最大条目数量。
+    超出数量时按最近最少使用的顺序淘汰；被淘汰的资源只要
+    还有别处在引用，依然可以在缓存中命中。
+    ``maxsize`` 的值是 ``None`` 的话，表示不做限制。
+    :see: load()
+    """
+    global _resource_cache_size
+    _resource_cache_size = maxsize
+    if maxsize is not None:
+        while len(_resource_cache_strong) > maxsize:
+            _resource_cache_strong.popitem(last=False)
+
+
+def clear_find_cache():
+    """一个访问函数。
+    删除 ``find()`` 函数的解析结果缓存中的所有对象。
+    :see: find()
+    """
+    global _path_kinds_key
+    _find_cache.clear()
+    _resolve.cache_clear()
+    _path_kinds_key = None
 
 
 def _open(resource_url):
@@ -959,16 +1253,37 @@ def _open(resource_url):
     :param resource_url: 一个要加载的资源地址。默认协议是 "nltk:" ，
         就是``nltk_data/``目录所在位置。
     """
+    # Normalize before consulting the cache so a relative file: URL is
+    # keyed by its absolute form, not by a cwd-dependent spelling.
+    protocol, path_, pointer = _resolve(normalize_resource_url(resource_url))
+
+    if pointer is not None:
+        return pointer.open()
+    else:
+        return urlopen(resource_url)
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve(resource_url):
+    """一个辅助函数。
+    把一个资源地址解析成 ``(protocol, path_, pointer)`` 三元组，
+    其中 ``pointer`` 是一个路径指针，
+    或者当资源地址要委托给 ``urlopen`` 时是 ``None`` 。
+    解析结果会被缓存起来，因为许多组件会反复打开同一个资源地址。
+
+    :type resource_url: str
+    :param resource_url: 一个要解析的资源地址。
+    """
     resource_url = normalize_resource_url(resource_url)
     protocol, path_ = split_resource_url(resource_url)
 
     if protocol is None or protocol.lower() == "nltk":
-        return find(path_, path + [""]).open()
+        return protocol, path_, find(path_, path + [""])
     elif protocol.lower() == "file":
         # urllib might not use mode='rb', so handle this one ourselves:
-        return find(path_, [""]).open()
+        return protocol, path_, find(path_, [""])
     else:
-        return urlopen(resource_url)
+        return protocol, path_, None
 
 
 ######################################################################
@@ -979,18 +1294,28 @@ def _open(resource_url):
 # decorator to LazyLoader, this is resource.__class__ responsibility.
 
 
+# Guards LazyLoader.__load() so that concurrent attribute accesses
+# can't both run the (potentially expensive) resource load.
+_lazy_loader_lock = threading.Lock()
+
+
 class LazyLoader(object):
-    @py3_data
     def __init__(self, _path):
         self._path = _path
 
     def __load(self):
-        resource = load(self._path)
-        # This is where the magic happens!  Transform ourselves into
-        # the object by modifying our own __dict__ and __class__ to
-        # match that of `resource`.
-        self.__dict__ = resource.__dict__
-        self.__class__ = resource.__class__
+        with _lazy_loader_lock:
+            if self.__class__ is not LazyLoader:
+                # Another thread already transformed us.
+                return
+            resource = load(self._path)
+            # This is where the magic happens!  Transform ourselves into
+            # the object by modifying our own __dict__ and __class__ to
+            # match that of `resource`.  The __dict__ swap must come
+            # first: unlocked readers only check __class__, so once it
+            # changes the instance must already be fully materialized.
+            self.__dict__ = resource.__dict__
+            self.__class__ = resource.__class__
 
     def __getattr__(self, attr):
         self.__load()
@@ -998,11 +1323,16 @@ class LazyLoader(object):
         # __class__ to something new:
         return getattr(self, attr)
 
-    def __repr__(self):
+    def force_load(self):
+        """显式地把占位对象变成真正的资源对象。
+        为真正需要立即加载资源的调用者准备的方法。"""
         self.__load()
-        # This looks circular, but its not, since __load() changes our
-        # __class__ to something new:
-        return repr(self)
+
+    def __repr__(self):
+        # Don't trigger the load: a stray log line or debugger repr
+        # shouldn't cost a multi-second resource load.  (Once loaded,
+        # __class__ has changed and the real repr takes over.)
+        return "<LazyLoader for %r (not yet loaded)>" % (self._path,)
 
 
 ######################################################################
@@ -1010,6 +1340,43 @@ class LazyLoader(object):
 ######################################################################
 
 
+# A bounded LRU pool of open zip file handles, so that reading many
+# members from the same archive doesn't pay an open/close syscall pair
+# per member.  The cap stays well under the process file-descriptor
+# limit.
+try:
+    import resource as _resource
+except ImportError:
+    _ZIP_HANDLE_LIMIT = 64
+else:
+    _soft_nofile = _resource.getrlimit(_resource.RLIMIT_NOFILE)[0]
+    if _soft_nofile < 0:  # RLIM_INFINITY
+        _ZIP_HANDLE_LIMIT = 64
+    else:
+        _ZIP_HANDLE_LIMIT = max(8, min(64, _soft_nofile // 4))
+
+_zip_handle_pool = OrderedDict()
+_zip_handle_lock = threading.Lock()
+
+
+def _acquire_zip_handle(filename):
+    """从句柄池中取出（或新打开）一个压缩文件的句柄。"""
+    with _zip_handle_lock:
+        fp = _zip_handle_pool.pop(filename, None)
+    if fp is None or fp.closed:
+        fp = open(filename, "rb")
+    return fp
+
+
+def _release_zip_handle(filename, fp):
+    """把压缩文件的句柄归还到句柄池中，超量时关闭最旧的句柄。"""
+    with _zip_handle_lock:
+        _zip_handle_pool[filename] = fp
+        while len(_zip_handle_pool) > _ZIP_HANDLE_LIMIT:
+            _, oldest = _zip_handle_pool.popitem(last=False)
+            oldest.close()
+
+
 class OpenOnDemandZipFile(zipfile.ZipFile):
     """
     这是 ``zipfile.ZipFile`` 的一个子类，不管什么时候都会关闭文件的指针；
@@ -1021,9 +1388,8 @@ class OpenOnDemandZipFile(zipfile.ZipFile):
     （例如， ``write()`` 和 ``writestr()`` 方法都是被禁用的。）
     """
 
-    @py3_data
     def __init__(self, filename):
-        if not isinstance(filename, string_types):
+        if not isinstance(filename, str):
             raise TypeError("ReopenableZipFile filename must be a string")
         zipfile.ZipFile.__init__(self, filename)
         assert self.filename == filename
@@ -1031,16 +1397,42 @@ class OpenOnDemandZipFile(zipfile.ZipFile):
         # After closing a ZipFile object, the _fileRefCnt needs to be cleared
         # for Python2and3 compatible code.
         self._fileRefCnt = 0
+        self._dir_prefix_cache = None
+        # Instances are shared through _zipfile_cache, so reads must
+        # not race on self.fp.
+        self._read_lock = threading.Lock()
+
+    def dir_prefixes(self):
+        """返回压缩文件中所有目录前缀组成的一个集合（惰性建立并缓存）。"""
+        # ZipFilePathPointer probes directory membership once per
+        # pointer; a cached set turns each O(N) namelist scan into an
+        # O(1) lookup.  The central directory is read once in __init__
+        # and never changes, so the set can't go stale.
+        if self._dir_prefix_cache is None:
+            prefixes = set()
+            for name in self.namelist():
+                i = name.find("/")
+                while i != -1:
+                    prefixes.add(name[: i + 1])
+                    i = name.find("/", i + 1)
+            self._dir_prefix_cache = prefixes
+        return self._dir_prefix_cache
 
     def read(self, name):
-        assert self.fp is None
-        self.fp = open(self.filename, "rb")
-        value = zipfile.ZipFile.read(self, name)
-        # Ensure that _fileRefCnt needs to be set for Python2and3 compatible code.
-        # Since we only opened one file here, we add 1.
-        self._fileRefCnt += 1
-        self.close()
-        return value
+        with self._read_lock:
+            assert self.fp is None
+            self.fp = _acquire_zip_handle(self.filename)
+            # Hold an extra reference so ZipFile's internal bookkeeping
+            # doesn't close the pooled handle when the member stream is
+            # exhausted.
+            self._fileRefCnt = 1
+            try:
+                value = zipfile.ZipFile.read(self, name)
+            finally:
+                fp, self.fp = self.fp, None
+                self._fileRefCnt = 0
+                _release_zip_handle(self.filename, fp)
+            return value
 
     def write(self, *args, **kwargs):
         """:raise NotImplementedError: OpenOnDemandZipfile is read-only"""
@@ -1058,6 +1450,17 @@ class OpenOnDemandZipFile(zipfile.ZipFile):
 # { Seekable Unicode Stream Reader
 ######################################################################
 
+# Translation table mapping each byte to 1 if it starts a UTF-8
+# character (i.e. is not a continuation byte) and 0 otherwise.  Used by
+# ``SeekableUnicodeStreamReader._char_seek_forward()`` to count code
+# points at C speed via ``bytes.translate``.
+_UTF8_START_BYTES = bytes(0 if (b & 0xC0) == 0x80 else 1 for b in range(256))
+
+# Matches any character that str.splitlines() treats as a line
+# boundary.  Used by ``readline()`` to detect a complete line without
+# allocating a list of every buffered line per iteration.
+_LINE_END_RE = re.compile("[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
 
 class SeekableUnicodeStreamReader(object):
     """一个实例化类。
@@ -1072,16 +1475,53 @@ class SeekableUnicodeStreamReader(object):
     不应该导致任何Python内部unicode编码问题。
     """
 
-    DEBUG = True  # : If true, then perform extra sanity checks.
+    DEBUG = False
+    """If true, ``tell()`` re-reads and re-decodes a 50-byte window to
+       audit its own answer.  That costs a seek, a read and a decode
+       per call, so it's off by default; flip it back on (on the
+       class) when diagnosing position-tracking problems."""
+
+    __slots__ = (
+        "stream",
+        "_pos",
+        "encoding",
+        "errors",
+        "decode",
+        "_incr_decoder",
+        "_is_utf8",
+        "_nl_byte_safe",
+        "bytebuffer",
+        "linebuffer",
+        "_linebuffer_char_count",
+        "_rewind_checkpoint",
+        "_rewind_numchars",
+        "_bom",
+    )
 
-    @py3_data
     def __init__(self, stream, encoding, errors="strict"):
-        # Rewind the stream to its beginning.
-        stream.seek(0)
+        # _read() and _char_seek_forward() issue many tiny reads (down
+        # to a single byte); on a raw unbuffered stream each one is a
+        # syscall, so interpose a userspace buffer.  Buffered streams
+        # (including BytesIO, GzipFile, and zip member files) pass
+        # through untouched.
+        if isinstance(stream, io.RawIOBase):
+            stream = io.BufferedReader(stream)
+
+        # Rewind the stream to its beginning, unless it's already there
+        # (the common just-opened case): even a no-op seek() flushes a
+        # BufferedReader's read-ahead buffer.
+        if stream.tell() != 0:
+            stream.seek(0)
 
         self.stream = stream
         """The underlying stream."""
 
+        self._pos = 0
+        """The current byte offset in the underlying stream, tracked
+           locally because stream.tell() on buffered readers is
+           surprisingly expensive and this class queries the position
+           on every read."""
+
         self.encoding = encoding
         """The name of the encoding that should be used to encode the
            underlying stream."""
@@ -1095,6 +1535,12 @@ class SeekableUnicodeStreamReader(object):
         """The function that is used to decode byte strings into
            unicode strings."""
 
+        self._incr_decoder = codecs.getincrementaldecoder(encoding)(errors)
+        """The incremental decoder used by ``_incr_decode()``.  It
+           retains trailing truncated byte sequences in its internal
+           state instead of raising, so partial reads don't cost an
+           exception each."""
+
         self.bytebuffer = b""
         """A buffer to use bytes that have been read but have not yet
            been decoded.  This is only used when the final bytes from
@@ -1111,6 +1557,11 @@ class SeekableUnicodeStreamReader(object):
            to the beginning of the buffer to determine the correct
            file position in the underlying byte stream."""
 
+        self._linebuffer_char_count = 0
+        """The total number of characters currently held in
+           ``linebuffer``, maintained incrementally so that ``tell()``
+           doesn't have to re-sum the buffered lines on every call."""
+
         self._rewind_checkpoint = 0
         """The file position at which the most recent read on the
            underlying stream began.  This is used, together with
@@ -1127,6 +1578,36 @@ class SeekableUnicodeStreamReader(object):
         """The length of the byte order marker at the beginning of
            the stream (or None for no byte order marker)."""
 
+        enc = self.encoding.lower().replace(" ", "").replace("-", "")
+        self._is_utf8 = enc == "utf8"
+        """True if the stream is UTF-8 encoded; enables the byte-level
+           fast path in ``_char_seek_forward()``."""
+
+        self._nl_byte_safe = self._is_utf8 or enc in (
+            "ascii",
+            "usascii",
+            "latin1",
+            "iso88591",
+            "cp1252",
+        )
+        """True if a 0x0A/0x0D byte in the stream can only ever encode
+           a newline character (never part of a multi-byte sequence);
+           enables the raw-byte line search in ``readline()``."""
+
+        if self._bom is None and enc in ("utf16", "utf32"):
+            # _read() strips any BOM before decoding, and the
+            # incremental utf16/utf32 decoders refuse BOM-less input;
+            # pin the platform-native byte order explicitly, which is
+            # what the stateless decoder assumed anyway.
+            self.encoding = enc + ("le" if sys.byteorder == "little" else "be")
+        if self.encoding != encoding:
+            # The encoding was refined by the BOM (or just above);
+            # rebuild the decoders to match.  The refined names spell
+            # e.g. "utf16-le"; insert the hyphen codecs expects.
+            codec = codecs.lookup(self.encoding.replace("utf", "utf-", 1))
+            self.decode = codec.decode
+            self._incr_decoder = codec.incrementaldecoder(errors)
+
     # /////////////////////////////////////////////////////////////////
     # Read methods
     # /////////////////////////////////////////////////////////////////
@@ -1146,6 +1627,7 @@ class SeekableUnicodeStreamReader(object):
         if self.linebuffer:
             chars = "".join(self.linebuffer) + chars
             self.linebuffer = None
+            self._linebuffer_char_count = 0
             self._rewind_numchars = None
 
         return chars
@@ -1153,9 +1635,14 @@ class SeekableUnicodeStreamReader(object):
     def discard_line(self):
         if self.linebuffer and len(self.linebuffer) > 1:
             line = self.linebuffer.pop(0)
+            self._linebuffer_char_count -= len(line)
             self._rewind_numchars += len(line)
         else:
-            self.stream.readline()
+            # Read through the reader itself so the byte buffer, line
+            # buffer and rewind bookkeeping stay consistent; the old
+            # raw stream.readline() fallback bypassed all three and
+            # could re-consume bytes already held in the byte buffer.
+            self.readline()
 
     def readline(self, size=None):
         """
@@ -1187,9 +1674,16 @@ class SeekableUnicodeStreamReader(object):
         # not be a complete line; so let _read() deal with it.)
         if self.linebuffer and len(self.linebuffer) > 1:
             line = self.linebuffer.pop(0)
+            self._linebuffer_char_count -= len(line)
             self._rewind_numchars += len(line)
             return line
 
+        # For encodings where a newline byte can't occur inside a
+        # multi-byte character, find the line end in the raw bytes and
+        # decode once, instead of decoding + splitting per block.
+        if self._nl_byte_safe:
+            return self._readline_bytes(size)
+
         readsize = size or 72
         chars = ""
 
@@ -1197,9 +1691,10 @@ class SeekableUnicodeStreamReader(object):
         if self.linebuffer:
             chars += self.linebuffer.pop()
             self.linebuffer = None
+            self._linebuffer_char_count = 0
 
         while True:
-            startpos = self.stream.tell() - len(self.bytebuffer)
+            startpos = self._pos - len(self.bytebuffer)
             new_chars = self._read(readsize)
 
             # If we're at a '\r', then read one extra character, since
@@ -1207,20 +1702,23 @@ class SeekableUnicodeStreamReader(object):
             if new_chars and new_chars.endswith("\r"):
                 new_chars += self._read(1)
 
+            # Only scan the characters that haven't been searched yet
+            # (minus one, in case the old text ended with a complete
+            # line terminator), and split just once, when a terminator
+            # is actually present.
+            scan_from = max(len(chars) - 1, 0)
             chars += new_chars
-            lines = chars.splitlines(True)
-            if len(lines) > 1:
-                line = lines[0]
-                self.linebuffer = lines[1:]
-                self._rewind_numchars = len(new_chars) - (len(chars) - len(line))
-                self._rewind_checkpoint = startpos
+            if _LINE_END_RE.search(chars, scan_from) is not None:
+                lines = chars.splitlines(True)
+                if len(lines) > 1:
+                    line = lines[0]
+                    self.linebuffer = lines[1:]
+                    self._linebuffer_char_count = len(chars) - len(line)
+                    self._rewind_numchars = len(new_chars) - (len(chars) - len(line))
+                    self._rewind_checkpoint = startpos
+                else:  # a single complete line
+                    line = lines[0]
                 break
-            elif len(lines) == 1:
-                line0withend = lines[0]
-                line0withoutend = lines[0].splitlines(False)[0]
-                if line0withend != line0withoutend:  # complete line
-                    line = line0withend
-                    break
 
             if not new_chars or size is not None:
                 line = chars
@@ -1232,6 +1730,95 @@ class SeekableUnicodeStreamReader(object):
 
         return line
 
+    def _readline_bytes(self, size):
+        """一个辅助方法。
+        ``readline()`` 方法的字节级实现。
+        先在原始字节中用 ``bytes.find`` 搜索行结束符，
+        只在找到之后才进行一次解码，
+        避免每一轮循环都重新解码加切分已积累的内容。
+        """
+        readsize = size or 72
+        prefix = ""
+
+        # If there's a remaining incomplete line in the buffer, add it.
+        if self.linebuffer:
+            prefix = self.linebuffer.pop()
+            self.linebuffer = None
+            self._linebuffer_char_count = 0
+
+        # Skip past the byte order marker, if present.
+        if self._bom and self._pos == 0:
+            self._pos += len(self.stream.read(self._bom))
+
+        startpos = self._pos - len(self.bytebuffer)
+        buf = self.bytebuffer
+        search_start = 0
+
+        while True:
+            new_bytes = self.stream.read(readsize)
+            self._pos += len(new_bytes)
+            buf += new_bytes
+
+            # Find the earliest newline byte, if any.  Bytes already
+            # searched on a previous iteration are skipped.
+            idx = buf.find(b"\n", search_start)
+            cr = buf.find(b"\r", search_start, idx if idx != -1 else None)
+            if cr != -1:
+                idx = cr
+            if idx != -1:
+                # If the buffer ends at a '\r', then read one extra
+                # byte, since it might be the '\n' of a '\r\n' pair.
+                if buf[idx] == 0x0D and idx == len(buf) - 1:
+                    extra = self.stream.read(1)
+                    self._pos += len(extra)
+                    buf += extra
+                break
+
+            if not new_bytes or size is not None:
+                break
+
+            search_start = len(buf)
+            # Read successively larger blocks of text.
+            if readsize < 8000:
+                readsize *= 2
+
+        # Decode everything we read (surplus goes to the linebuffer).
+        new_chars, bytes_decoded = self._incr_decode(buf)
+
+        # If we got bytes but couldn't decode any, then read further
+        # (a single exact-size read for UTF-8; see _read()).
+        if (size is not None) and (not new_chars) and buf:
+            if self._is_utf8 and 0xC2 <= buf[0] < 0xF5:
+                b = buf[0]
+                need = 2 if b < 0xE0 else 3 if b < 0xF0 else 4
+                new_bytes = self.stream.read(need - len(buf))
+                self._pos += len(new_bytes)
+                buf += new_bytes
+                if new_bytes:
+                    new_chars, bytes_decoded = self._incr_decode(buf)
+            while not new_chars:
+                new_bytes = self.stream.read(1)
+                if not new_bytes:
+                    break  # end of file.
+                self._pos += 1
+                buf += new_bytes
+                new_chars, bytes_decoded = self._incr_decode(buf)
+
+        # Record any bytes we didn't consume.
+        self.bytebuffer = buf[bytes_decoded:]
+
+        chars = prefix + new_chars
+        lines = chars.splitlines(True)
+        if len(lines) > 1:
+            line = lines[0]
+            self.linebuffer = lines[1:]
+            self._linebuffer_char_count = len(chars) - len(line)
+            self._rewind_numchars = len(new_chars) - (len(chars) - len(line))
+            self._rewind_checkpoint = startpos
+        else:
+            line = chars
+        return line
+
     def readlines(self, sizehint=None, keepends=True):
         """
         读取流数据内容，使用读取器的编码进行解码，
@@ -1313,11 +1900,20 @@ class SeekableUnicodeStreamReader(object):
                 "SeekableUnicodeStreamReader -- consider "
                 "using char_seek_forward() instead."
             )
-        self.stream.seek(offset, whence)
+        if whence == 0 and offset == self._pos:
+            # The underlying stream is already at the target; just drop
+            # any decoded lookahead rather than paying for a
+            # buffer-flushing no-op seek.
+            self._rewind_checkpoint = offset
+        else:
+            self.stream.seek(offset, whence)
+            # Seeks are rare; resynchronize the local cursor from the
+            # stream rather than duplicating the whence arithmetic.
+            self._pos = self._rewind_checkpoint = self.stream.tell()
         self.linebuffer = None
+        self._linebuffer_char_count = 0
         self.bytebuffer = b""
         self._rewind_numchars = None
-        self._rewind_checkpoint = self.stream.tell()
 
     def char_seek_forward(self, offset):
         """
@@ -1342,11 +1938,21 @@ class SeekableUnicodeStreamReader(object):
         """
         if est_bytes is None:
             est_bytes = offset
+
+        # Skip past the byte order marker, if present: the decode
+        # windows below must not contain it.
+        if self._bom and self._pos == 0:
+            self._pos += len(self.stream.read(self._bom))
+
+        if self._is_utf8:
+            return self._utf8_seek_forward(offset, est_bytes)
+
         bytes = b""
 
         while True:
             # Read in a block of bytes.
             newbytes = self.stream.read(est_bytes - len(bytes))
+            self._pos += len(newbytes)
             bytes += newbytes
 
             # Decode the bytes to characters.
@@ -1356,6 +1962,7 @@ class SeekableUnicodeStreamReader(object):
             # backwards over any truncated characters, and return.
             if len(chars) == offset:
                 self.stream.seek(-len(bytes) + bytes_decoded, 1)
+                self._pos += bytes_decoded - len(bytes)
                 return
 
             # If we went too far, then we can back-up until we get it
@@ -1366,11 +1973,59 @@ class SeekableUnicodeStreamReader(object):
                     est_bytes += offset - len(chars)
                     chars, bytes_decoded = self._incr_decode(bytes[:est_bytes])
                 self.stream.seek(-len(bytes) + bytes_decoded, 1)
+                self._pos += bytes_decoded - len(bytes)
                 return
 
             # Otherwise, we haven't read enough bytes yet; loop again.
             est_bytes += offset - len(chars)
 
+    def _utf8_seek_forward(self, offset, est_bytes):
+        """
+        ``_char_seek_forward()`` 方法的 UTF-8 快速路径实现。
+        通过统计首字节（非延续字节）来数代码点，
+        不需要反复运行解码器。
+        """
+        tbl = _UTF8_START_BYTES
+        buf = b""
+
+        while True:
+            # Read in a block of bytes.
+            newbytes = self.stream.read(est_bytes - len(buf))
+            self._pos += len(newbytes)
+            buf += newbytes
+
+            # Tag each start byte with 1, each continuation byte with 0.
+            starts = buf.translate(tbl)
+            nchars = starts.count(1)
+
+            if nchars < offset:
+                # We haven't read enough bytes yet; loop again.
+                est_bytes += offset - nchars
+                continue
+
+            if nchars == offset:
+                # The final character may still be truncated; a UTF-8
+                # character is at most 4 bytes, so reading 4 more is
+                # guaranteed to cover its continuation bytes.
+                tail = self.stream.read(4)
+                self._pos += len(tail)
+                buf += tail
+                starts = buf.translate(tbl)
+                nchars = starts.count(1)
+
+            if nchars > offset:
+                # Seek back to the start byte of character ``offset``:
+                # the first index whose cumulative start-byte count
+                # reaches offset + 1.
+                cut = bisect_left(list(accumulate(starts)), offset + 1)
+            else:
+                # End of stream: everything we read belongs to the
+                # first ``offset`` characters.
+                cut = len(buf)
+            self.stream.seek(cut - len(buf), 1)
+            self._pos += cut - len(buf)
+            return
+
     def tell(self):
         """
         在上游流数据返回当前字节位置。
@@ -1379,35 +2034,39 @@ class SeekableUnicodeStreamReader(object):
         """
         # If nothing's buffered, then just return our current filepos:
         if self.linebuffer is None:
-            return self.stream.tell() - len(self.bytebuffer)
+            return self._pos - len(self.bytebuffer)
 
         # Otherwise, we'll need to backtrack the filepos until we
         # reach the beginning of the buffer.
 
         # Store our original file position, so we can return here.
-        orig_filepos = self.stream.tell()
+        orig_filepos = self._pos
 
         # Calculate an estimate of where we think the newline is.
         bytes_read = (orig_filepos - len(self.bytebuffer)) - self._rewind_checkpoint
-        buf_size = sum(len(line) for line in self.linebuffer)
+        buf_size = self._linebuffer_char_count
         est_bytes = int(
             (bytes_read * self._rewind_numchars / (self._rewind_numchars + buf_size))
         )
 
         self.stream.seek(self._rewind_checkpoint)
+        self._pos = self._rewind_checkpoint
         self._char_seek_forward(self._rewind_numchars, est_bytes)
-        filepos = self.stream.tell()
+        filepos = self._pos
 
         # Sanity check
         if self.DEBUG:
             self.stream.seek(filepos)
-            check1 = self._incr_decode(self.stream.read(50))[0]
+            raw = self.stream.read(50)
+            self._pos = filepos + len(raw)
+            check1 = self._incr_decode(raw)[0]
             check2 = "".join(self.linebuffer)
             assert check1.startswith(check2) or check2.startswith(check1)
 
         # Return to our original filepos (so we don't have to throw
         # out our buffer.)
         self.stream.seek(orig_filepos)
+        self._pos = orig_filepos
 
         # Return the calculated filepos
         return filepos
@@ -1426,14 +2085,15 @@ class SeekableUnicodeStreamReader(object):
             return ""
 
         # Skip past the byte order marker, if present.
-        if self._bom and self.stream.tell() == 0:
-            self.stream.read(self._bom)
+        if self._bom and self._pos == 0:
+            self._pos += len(self.stream.read(self._bom))
 
         # Read the requested number of bytes.
         if size is None:
             new_bytes = self.stream.read()
         else:
             new_bytes = self.stream.read(size)
+        self._pos += len(new_bytes)
         bytes = self.bytebuffer + new_bytes
 
         # Decode the bytes into unicode characters
@@ -1441,10 +2101,23 @@ class SeekableUnicodeStreamReader(object):
 
         # If we got bytes but couldn't decode any, then read further.
         if (size is not None) and (not chars) and (len(new_bytes) > 0):
+            # For UTF-8 the lead byte says exactly how many bytes the
+            # truncated character still needs, so one read completes it
+            # (without over-reading into the next character).
+            if self._is_utf8 and 0xC2 <= bytes[0] < 0xF5:
+                b = bytes[0]
+                need = 2 if b < 0xE0 else 3 if b < 0xF0 else 4
+                new_bytes = self.stream.read(need - len(bytes))
+                self._pos += len(new_bytes)
+                bytes += new_bytes
+                if new_bytes:
+                    chars, bytes_decoded = self._incr_decode(bytes)
+            # Otherwise (or at end of file), crawl a byte at a time.
             while not chars:
                 new_bytes = self.stream.read(1)
                 if not new_bytes:
                     break  # end of file.
+                self._pos += 1
                 bytes += new_bytes
                 chars, bytes_decoded = self._incr_decode(bytes)
 
@@ -1465,54 +2138,84 @@ class SeekableUnicodeStreamReader(object):
         其中 ``chars`` 是解码完的unicode字符串，
         而 ``num_consumed`` 是吃掉的字节数量。
         """
-        while True:
-            try:
-                return self.decode(bytes, "strict")
-            except UnicodeDecodeError as exc:
-                # If the exception occurs at the end of the string,
-                # then assume that it's a truncation error.
-                if exc.end == len(bytes):
-                    return self.decode(bytes[: exc.start], self.errors)
-
-                # Otherwise, if we're being strict, then raise it.
-                elif self.errors == "strict":
-                    raise
-
-                # If we're not strict, then re-process it with our
-                # errors setting.  This *may* raise an exception.
-                else:
-                    return self.decode(bytes, self.errors)
-
+        if self._is_utf8:
+            # bytes.decode goes straight to the C codec and is about
+            # twice as fast as the codecs function-object path.  Trim a
+            # truncated trailing character first (a UTF-8 character is
+            # at most 4 bytes), mirroring what the incremental decoder
+            # would hold back in its state.
+            cut = len(bytes)
+            for i in range(len(bytes) - 1, max(len(bytes) - 5, -1), -1):
+                b = bytes[i]
+                if b & 0xC0 != 0x80:  # not a continuation byte
+                    if 0xC2 <= b < 0xF5:  # a multi-byte lead
+                        need = 2 if b < 0xE0 else 3 if b < 0xF0 else 4
+                        if len(bytes) - i < need:
+                            cut = i
+                    break
+            return bytes[:cut].decode("utf-8", self.errors), cut
+
+        # The incremental decoder buffers a trailing truncated
+        # character in its state rather than raising, so the old
+        # decode-catch-redecode dance (an exception per partial read)
+        # is unnecessary.  Each call decodes an independent byte
+        # window, so reset the state first.
+        decoder = self._incr_decoder
+        decoder.reset()
+        chars = decoder.decode(bytes, False)
+        pending = decoder.getstate()[0]
+        return chars, len(bytes) - len(pending)
+
+    # Maps a normalized encoding name to (bom_len, {bom: new_encoding}).
+    # All candidate BOMs for an encoding have the same length, so a
+    # single dict lookup on the read prefix replaces a linear scan.
     _BOM_TABLE = {
-        "utf8": [(codecs.BOM_UTF8, None)],
-        "utf16": [(codecs.BOM_UTF16_LE, "utf16-le"), (codecs.BOM_UTF16_BE, "utf16-be")],
-        "utf16le": [(codecs.BOM_UTF16_LE, None)],
-        "utf16be": [(codecs.BOM_UTF16_BE, None)],
-        "utf32": [(codecs.BOM_UTF32_LE, "utf32-le"), (codecs.BOM_UTF32_BE, "utf32-be")],
-        "utf32le": [(codecs.BOM_UTF32_LE, None)],
-        "utf32be": [(codecs.BOM_UTF32_BE, None)],
+        "utf8": (3, {codecs.BOM_UTF8: None}),
+        "utf16": (
+            2,
+            {codecs.BOM_UTF16_LE: "utf16-le", codecs.BOM_UTF16_BE: "utf16-be"},
+        ),
+        "utf16le": (2, {codecs.BOM_UTF16_LE: None}),
+        "utf16be": (2, {codecs.BOM_UTF16_BE: None}),
+        "utf32": (
+            4,
+            {codecs.BOM_UTF32_LE: "utf32-le", codecs.BOM_UTF32_BE: "utf32-be"},
+        ),
+        "utf32le": (4, {codecs.BOM_UTF32_LE: None}),
+        "utf32be": (4, {codecs.BOM_UTF32_BE: None}),
     }
 
     def _check_bom(self):
-        # Normalize our encoding name
-        enc = re.sub("[ -]", "", self.encoding.lower())
+        # Normalize our encoding name (plain str.replace beats a
+        # regex substitution for two fixed characters)
+        enc = self.encoding.lower().replace(" ", "").replace("-", "")
 
         # Look up our encoding in the BOM table.
         bom_info = self._BOM_TABLE.get(enc)
+        if not bom_info:
+            # No BOM possible for this encoding: no I/O needed at all.
+            return None
 
-        if bom_info:
-            # Read a prefix, to check against the BOM(s)
-            bytes = self.stream.read(16)
-            self.stream.seek(0)
-
-            # Check for each possible BOM.
-            for (bom, new_encoding) in bom_info:
-                if bytes.startswith(bom):
-                    if new_encoding:
-                        self.encoding = new_encoding
-                    return len(bom)
+        # Read just enough bytes to check against the BOM(s).  Any
+        # surplus goes into the byte buffer rather than seeking back,
+        # which would flush a BufferedReader's read-ahead buffer.
+        bom_len, boms = bom_info
+        bytes = self.stream.read(bom_len)
+        self._pos += len(bytes)
 
-        return None
+        try:
+            new_encoding = boms[bytes]
+        except KeyError:
+            # No BOM (or a short stream); the bytes are content, so
+            # rewind.  Stashing them in the byte buffer instead would
+            # make the first read(size) return up to bom_len characters
+            # more than requested.
+            self.stream.seek(0)
+            self._pos = 0
+            return None
+        if new_encoding:
+            self.encoding = new_encoding
+        return bom_len
 
 
 __all__ = [
@@ -1529,6 +2232,7 @@ __all__ = [
     "load",
     "show_cfg",
     "clear_cache",
+    "set_cache_size",
     "LazyLoader",
     "OpenOnDemandZipFile",
     "GzipFileSystemPathPointer",
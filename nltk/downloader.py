@@ -840,6 +840,9 @@ class Downloader(object):
                     # Data directory message:
                     elif isinstance(msg, SelectDownloadDirMessage):
                         download_dir = msg.download_dir
+
+        # Freshly installed packages may shadow earlier resolutions.
+        nltk.data.clear_find_cache()
         return True
 
     def is_stale(self, info_or_id, download_dir=None):
@@ -189,7 +189,7 @@ class LogicParser(object):
                     c = data[data_idx + len(symbol)]
                 else:
                     break
-            if Trie.LEAF in st:
+            if st.is_leaf:
                 # token is a complete symbol
                 if token:
                     mapping[len(out)] = token_start_idx
@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import unittest
 import nltk.data
 from nose.tools import assert_raises
@@ -20,3 +23,49 @@ class TestData(unittest.TestCase):
         assert no_such_thing in str(
             context.exception
         ), 'Exception message does not include full resource name'
+
+
+class TestPathPointers(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+
+    def test_join_validates_child(self):
+        # join() must check that the joined file exists, not just the
+        # parent that was validated when the pointer was built.
+        pointer = nltk.data.FileSystemPathPointer(self.tempdir)
+        with assert_raises(IOError):
+            pointer.join('missing_file')
+
+    def test_join_existing_child(self):
+        child = os.path.join(self.tempdir, 'present.txt')
+        open(child, 'w').close()
+        pointer = nltk.data.FileSystemPathPointer(self.tempdir)
+        assert pointer.join('present.txt').path == child
+
+
+class TestUrlNormalization(unittest.TestCase):
+    def test_relative_file_url_tracks_cwd(self):
+        # A relative file: URL resolves against the current working
+        # directory, so the result must not be reused after os.chdir().
+        dir1 = tempfile.mkdtemp()
+        dir2 = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, dir1)
+        self.addCleanup(shutil.rmtree, dir2)
+        old_cwd = os.getcwd()
+        self.addCleanup(os.chdir, old_cwd)
+
+        os.chdir(dir1)
+        url1 = nltk.data.normalize_resource_url('file:rel/thing')
+        os.chdir(dir2)
+        url2 = nltk.data.normalize_resource_url('file:rel/thing')
+        assert url1 != url2
+        assert url2 == nltk.data.normalize_resource_url(
+            'file:' + os.path.join(dir2, 'rel', 'thing')
+        )
+
+    def test_absolute_urls_are_stable(self):
+        url = 'file:%s' % os.path.join(os.path.sep, 'tmp', 'thing')
+        assert nltk.data.normalize_resource_url(
+            url
+        ) == nltk.data.normalize_resource_url(url)
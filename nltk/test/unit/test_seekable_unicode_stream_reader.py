@@ -127,6 +127,65 @@ def test_reader_on_large_string():
             pass
 
 
+# Non-yield-style ports of the tests above, so that test runners that
+# dropped yield-test support (pytest) still exercise check_reader.
+
+
+def test_reader_all_encodings():
+    random.seed(1234)
+    for string in STRINGS:
+        for encoding in ENCODINGS:
+            try:
+                string.encode(encoding)
+            except UnicodeEncodeError:
+                # skip strings that can't be encoded with the current encoding
+                continue
+            assert check_reader(string, encoding, 100) == 'passed'
+
+
+def test_reader_on_large_string_all_encodings():
+    random.seed(1234)
+    for encoding in ENCODINGS:
+        try:
+            LARGE_STRING.encode(encoding)
+        except UnicodeEncodeError:
+            # skip strings that can't be encoded with the current encoding
+            continue
+        assert check_reader(LARGE_STRING, encoding, 100) == 'passed'
+
+
+def test_utf8_bom_is_skipped():
+    import codecs
+
+    reader = SeekableUnicodeStreamReader(
+        BytesIO(codecs.BOM_UTF8 + 'hello\nworld'.encode('utf8')), 'utf8'
+    )
+    assert reader.read() == 'hello\nworld'
+    reader.seek(0)
+    assert reader.readline() == 'hello\n'
+
+
+def test_utf16_bom_sets_endianness():
+    # str.encode('utf-16') writes a native-order BOM; a reader told only
+    # 'utf16' must detect it and not return U+FEFF as content.
+    reader = SeekableUnicodeStreamReader(
+        BytesIO('hello'.encode('utf-16')), 'utf16'
+    )
+    assert reader.read() == 'hello'
+
+
+def test_no_bom_first_read_is_exact():
+    # When the stream has no BOM, the probed bytes are content and the
+    # first sized read must not return more characters than requested.
+    reader = SeekableUnicodeStreamReader(
+        BytesIO(b'And then there were none'), 'utf8'
+    )
+    assert reader.read(1) == 'A'
+    assert reader.read(3) == 'nd '
+    reader.seek(0)
+    assert reader.read(4) == 'And '
+
+
 def test_reader_stream_is_closed():
     reader = SeekableUnicodeStreamReader(BytesIO(b''), 'ascii')
     assert reader.stream.closed is False
@@ -58,8 +58,8 @@ class MWETokenizer(TokenizerI):
     def add_mwe(self, mwe):
         """Add a multi-word expression to the lexicon (stored as a word trie)
 
-        We use ``util.Trie`` to represent the trie. Its form is a dict of dicts. 
-        The key True marks the end of a valid MWE.
+        We use ``util.Trie`` to represent the trie. Its form is a dict of dicts.
+        The ``is_leaf`` node attribute marks the end of a valid MWE.
 
         :param mwe: The multi-word expression we're adding into the word trie
         :type mwe: tuple(str) or list(str)
@@ -70,9 +70,11 @@ class MWETokenizer(TokenizerI):
         >>> tokenizer.add_mwe(('a', 'b'))
         >>> tokenizer.add_mwe(('a', 'b', 'c'))
         >>> tokenizer.add_mwe(('a', 'x'))
-        >>> expected = {'a': {'x': {True: None}, 'b': {True: None, 'c': {True: None}}}}
+        >>> expected = {'a': {'x': {}, 'b': {'c': {}}}}
         >>> tokenizer._mwes == expected
         True
+        >>> tokenizer._mwes['a']['b'].is_leaf
+        True
 
         """
         self._mwes.insert(mwe)
@@ -105,7 +107,7 @@ class MWETokenizer(TokenizerI):
                     trie = trie[text[j]]
                     j = j + 1
                 else:
-                    if Trie.LEAF in trie:
+                    if trie.is_leaf:
                         # success!
                         result.append(self._separator.join(text[i:j]))
                         i = j